@@ -16,7 +16,8 @@ from typing import Dict, List, Any
 #                 "filename": str,
 #                 "download_url": str,
 #                 "status": "success" | "error",
-#                 "error_message": str (optional)
+#                 "error_message": str (optional),
+#                 "metrics": dict (optional LLM timings, e.g. time_to_first_field_s)
 #             }
 #         ],
 #         "error": str (optional top-level error)
@@ -47,7 +48,7 @@ def get_job(job_id: str) -> Dict[str, Any]:
     """Retrieves job details."""
     return jobs.get(job_id)
 
-def update_job_progress(job_id: str, word: str, filename: str = None, error: str = None):
+def update_job_progress(job_id: str, word: str, filename: str = None, error: str = None, metrics: Dict[str, Any] = None):
     """Updates the progress of a job with a new result."""
     if job_id not in jobs:
         return
@@ -63,6 +64,9 @@ def update_job_progress(job_id: str, word: str, filename: str = None, error: str
         result["filename"] = filename
         result["download_url"] = f"/api/download/{job_id}/{filename}"
         
+    if metrics:
+        result["metrics"] = metrics
+        
     if error:
         result["error_message"] = error
         job["errors"].append(error)
@@ -1,12 +1,274 @@
-from openai import OpenAI
 import json
-import requests
 import os
+import threading
+import time
+
+# openai and requests are imported on first use to keep backend startup fast
+
+# Base URLs can be overridden (e.g. to point at a local stand-in server for load testing)
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
+
+# Streaming and response budgets
+LLM_STREAM = os.getenv("LLM_STREAM", "1").lower() in ("1", "true", "yes")
+LLM_MAX_TOKENS = int(os.getenv("LLM_MAX_TOKENS", "1500"))
+LLM_MAX_RESPONSE_CHARS = int(os.getenv("LLM_MAX_RESPONSE_CHARS", "8000"))
+LLM_MAX_FIELD_CHARS = int(os.getenv("LLM_MAX_FIELD_CHARS", "1000"))
+LLM_MAX_LIST_ITEMS = int(os.getenv("LLM_MAX_LIST_ITEMS", "30"))
+LLM_STREAM_RETRIES = int(os.getenv("LLM_STREAM_RETRIES", "2"))
+
+# JSON whitespace, literal values and escape characters for IncrementalJSONValidator
+_JSON_WHITESPACE = " \t\r\n"
+_JSON_LITERALS = {"t": "true", "f": "false", "n": "null"}
+_JSON_ESCAPES = '"\\/bfnrtu'
+_HEX_DIGITS = "0123456789abcdefABCDEF"
+
+# Number states: where each character may lead, and which states may end a number
+_NUMBER_TRANSITIONS = {
+    "sign": {"0": "zero", "digit": "int"},
+    "zero": {".": "dot", "e": "exp"},
+    "int": {"digit": "int", ".": "dot", "e": "exp"},
+    "dot": {"digit": "frac"},
+    "frac": {"digit": "frac", "e": "exp"},
+    "exp": {"sign": "exp_sign", "digit": "exp_int"},
+    "exp_sign": {"digit": "exp_int"},
+    "exp_int": {"digit": "exp_int"},
+}
+_NUMBER_END_STATES = ("zero", "int", "frac", "exp_int")
+
+# What each open container expects next
+_KEY_OR_END, _KEY, _COLON, _VALUE, _VALUE_OR_END, _COMMA_OR_END = (
+    "key_or_end", "key", "colon", "value", "value_or_end", "comma_or_end"
+)
+
+class StreamAborted(Exception):
+    """Raised when a streamed completion can no longer become valid JSON or exceeds a budget."""
+    pass
+
+class IncrementalJSONValidator:
+    """Checks a streamed JSON object chunk by chunk so bad responses can be abandoned early.
+
+    Follows the JSON grammar (keys, colons, commas, strings, numbers and
+    literals) and aborts on the first character that can't lead to a valid
+    object, or once a response, string or list budget is exceeded.
+    """
+    def __init__(self, max_chars=LLM_MAX_RESPONSE_CHARS, max_field_chars=LLM_MAX_FIELD_CHARS, max_list_items=LLM_MAX_LIST_ITEMS):
+        self.max_chars = max_chars
+        self.max_field_chars = max_field_chars
+        self.max_list_items = max_list_items
+        self.chars = 0
+        self.prefix = ""
+        self.started = False
+        self.done = False
+        # Each entry is [bracket, expected, item_count]
+        self.stack = []
+        # Scalar currently being read: None, "string", "number" or "literal"
+        self.scalar = None
+        self.string_is_key = False
+        self.string_len = 0
+        self.escape = False
+        self.unicode_left = 0
+        self.number_state = None
+        self.literal = ""
+        self.literal_pos = 0
+        self.fields_completed = 0
+        self.first_field_at = None
+
+    def feed(self, chunk):
+        """Consumes the next piece of the response, raising StreamAborted if it can't be valid."""
+        self.chars += len(chunk)
+        if self.chars > self.max_chars:
+            raise StreamAborted(f"response exceeded {self.max_chars} characters")
+        for char in chunk:
+            self._feed_char(char)
+
+    def _feed_char(self, char):
+        if not self.started:
+            # Allow whitespace and a leading markdown fence before the object
+            if char.isspace():
+                return
+            if char == "{" and self.prefix.lower() in ("", "```", "```json"):
+                self.started = True
+                self.stack.append(["{", _KEY_OR_END, 0])
+                return
+            self.prefix += char
+            if not "```json".startswith(self.prefix.lower()):
+                raise StreamAborted(f"unexpected text before JSON: {self.prefix!r}")
+            return
+
+        if self.done:
+            if not (char.isspace() or char == "`"):
+                raise StreamAborted("unexpected text after JSON")
+            return
+
+        if self.scalar == "string":
+            self._string_char(char)
+            return
+        if self.scalar == "number":
+            if self._number_char(char):
+                return
+            # The number has ended; the character is handled as structure below
+            if self.number_state not in _NUMBER_END_STATES:
+                raise StreamAborted("invalid number in JSON")
+            self.scalar = None
+            self._value_done()
+        elif self.scalar == "literal":
+            if char != self.literal[self.literal_pos]:
+                raise StreamAborted(f"invalid literal in JSON (expected {self.literal!r})")
+            self.literal_pos += 1
+            if self.literal_pos == len(self.literal):
+                self.scalar = None
+                self._value_done()
+            return
+
+        if char in _JSON_WHITESPACE:
+            return
+
+        top = self.stack[-1]
+        expected = top[1]
+        if expected in (_KEY_OR_END, _KEY):
+            if char == '"':
+                top[1] = _COLON
+                self._start_string(is_key=True)
+            elif char == "}" and expected == _KEY_OR_END:
+                self._close()
+            else:
+                raise StreamAborted(f"expected a key in JSON, got {char!r}")
+        elif expected == _COLON:
+            if char != ":":
+                raise StreamAborted(f"expected ':' in JSON, got {char!r}")
+            top[1] = _VALUE
+        elif expected == _VALUE_OR_END and char == "]":
+            self._close()
+        elif expected in (_VALUE, _VALUE_OR_END):
+            self._start_value(char)
+        else:
+            closer = "}" if top[0] == "{" else "]"
+            if char == ",":
+                top[1] = _KEY if top[0] == "{" else _VALUE
+            elif char == closer:
+                self._close()
+            else:
+                raise StreamAborted(f"expected ',' or {closer!r} in JSON, got {char!r}")
+
+    def _start_value(self, char):
+        top = self.stack[-1]
+        if top[0] == "[":
+            top[2] += 1
+            if top[2] > self.max_list_items:
+                raise StreamAborted(f"list exceeded {self.max_list_items} items")
+        top[1] = _COMMA_OR_END
+        if char == '"':
+            self._start_string(is_key=False)
+        elif char == "{":
+            self.stack.append(["{", _KEY_OR_END, 0])
+        elif char == "[":
+            self.stack.append(["[", _VALUE_OR_END, 0])
+        elif char == "-" or char.isdigit():
+            self.scalar = "number"
+            self.number_state = "sign" if char == "-" else ("zero" if char == "0" else "int")
+        elif char in _JSON_LITERALS:
+            self.scalar = "literal"
+            self.literal = _JSON_LITERALS[char]
+            self.literal_pos = 1
+        else:
+            raise StreamAborted(f"unexpected character {char!r} in JSON")
+
+    def _start_string(self, is_key):
+        self.scalar = "string"
+        self.string_is_key = is_key
+        self.string_len = 0
+        self.escape = False
+        self.unicode_left = 0
+
+    def _string_char(self, char):
+        if self.unicode_left:
+            if char not in _HEX_DIGITS:
+                raise StreamAborted("invalid unicode escape in JSON string")
+            self.unicode_left -= 1
+        elif self.escape:
+            if char not in _JSON_ESCAPES:
+                raise StreamAborted(f"invalid escape '\\{char}' in JSON string")
+            self.escape = False
+            if char == "u":
+                self.unicode_left = 4
+        elif char == "\\":
+            self.escape = True
+        elif char == '"':
+            self.scalar = None
+            if not self.string_is_key:
+                self._value_done()
+            return
+        elif ord(char) < 0x20:
+            raise StreamAborted("control character in JSON string")
+        self.string_len += 1
+        if self.string_len > self.max_field_chars:
+            raise StreamAborted(f"string value exceeded {self.max_field_chars} characters")
+
+    def _number_char(self, char):
+        """Advances the number state; returns False if char isn't part of the number."""
+        if char.isdigit():
+            # Only a leading zero is special (no further integer digits may follow it)
+            kind = "0" if char == "0" and self.number_state == "sign" else "digit"
+        elif char in "eE":
+            kind = "e"
+        elif char in "+-":
+            kind = "sign"
+        else:
+            kind = char
+        next_state = _NUMBER_TRANSITIONS[self.number_state].get(kind)
+        if next_state is None:
+            return False
+        self.number_state = next_state
+        return True
+
+    def _close(self):
+        self.stack.pop()
+        if not self.stack:
+            self.done = True
+        else:
+            self._value_done()
+
+    def _value_done(self):
+        # A value finishing directly inside the root object completes a top-level field
+        if len(self.stack) == 1:
+            self.fields_completed += 1
+            if self.first_field_at is None:
+                self.first_field_at = time.monotonic()
+
+# Cached OpenAI clients for server-configured keys only (Ollama and OPENROUTER_API_KEY),
+# so connection pools are reused without holding on to keys supplied by callers
+_clients = {}
+_clients_lock = threading.Lock()
+
+def new_client(base_url, api_key):
+    """Creates an OpenAI client; the caller is responsible for closing it."""
+    from openai import OpenAI
+    return OpenAI(base_url=base_url, api_key=api_key)
+
+def get_client(base_url, api_key):
+    """Returns a shared OpenAI client for a server-configured endpoint, creating it on first use."""
+    key = (base_url, api_key)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = new_client(base_url, api_key)
+            _clients[key] = client
+        return client
+
+def warm_up():
+    """Imports the HTTP libraries and creates the LLM clients ahead of the first request."""
+    import requests  # noqa: F401
+    get_client(f"{OLLAMA_BASE_URL}/v1", "ollama")
+    openrouter_key = os.getenv("OPENROUTER_API_KEY")
+    if openrouter_key:
+        get_client(OPENROUTER_BASE_URL, openrouter_key)
 
 def get_ollama_models():
     """Fetches available models from local Ollama instance."""
+    import requests
     try:
-        response = requests.get("http://localhost:11434/api/tags")
+        response = requests.get(f"{OLLAMA_BASE_URL}/api/tags")
         if response.status_code == 200:
             data = response.json()
             return [model['name'] for model in data['models']]
@@ -17,8 +279,9 @@ def get_ollama_models():
 
 def get_openrouter_models():
     """Fetches available models from OpenRouter API."""
+    import requests
     try:
-        response = requests.get("https://openrouter.ai/api/v1/models")
+        response = requests.get(f"{OPENROUTER_BASE_URL}/models")
         if response.status_code == 200:
             data = response.json()
             # Return a list of dictionaries with id and name, sorted by id
@@ -29,22 +292,22 @@ def get_openrouter_models():
         print(f"Error fetching OpenRouter models: {e}")
         return []
 
-def get_word_data(word, api_key=None, provider="openrouter", model=None):
+def get_word_data(word, api_key=None, provider="openrouter", model=None, metrics=None):
+    """Fetches word data from the LLM. If a metrics dict is given it is filled with timing details."""
+    # Only server-configured keys use the shared client cache
+    shared_client = provider == "ollama" or not api_key or api_key == os.getenv("OPENROUTER_API_KEY")
     if provider == "ollama":
-        base_url = "http://localhost:11434/v1"
+        base_url = f"{OLLAMA_BASE_URL}/v1"
         api_key = "ollama" # Dummy key required by client
         # Use provided model or default to a common one if not specified
         model = model or "llama3" 
     else:
-        base_url = "https://openrouter.ai/api/v1"
+        base_url = OPENROUTER_BASE_URL
         # Use API Key from environment variable
         api_key = api_key or os.getenv("OPENROUTER_API_KEY")
         model = model or "google/gemini-1.5-flash" # Default to Gemini Flash if not specified
 
-    client = OpenAI(
-        base_url=base_url,
-        api_key=api_key,
-    )
+    client = get_client(base_url, api_key) if shared_client else new_client(base_url, api_key)
 
     prompt = f"""
     Provide a JSON object for the word "{word}" with the following fields:
@@ -65,22 +328,89 @@ def get_word_data(word, api_key=None, provider="openrouter", model=None):
     Ensure the response is valid JSON only.
     """
 
+    messages = [
+        {"role": "system", "content": "You are a helpful educational assistant. Output only valid JSON."},
+        {"role": "user", "content": prompt}
+    ]
+
+    start = time.monotonic()
+    attempts = 0
+    aborts = []
+    first_field_at = None
+    attempt_start = start
     try:
-        completion = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": "You are a helpful educational assistant. Output only valid JSON."},
-                {"role": "user", "content": prompt}
-            ]
-        )
-        
-        content = completion.choices[0].message.content
-        print(f"DEBUG: Raw content from LLM for {word}: {content}")
-        
-        # Clean up potential markdown code blocks
-        content = content.replace("```json", "").replace("```", "").strip()
-        
-        return json.loads(content)
+        while True:
+            attempts += 1
+            attempt_start = time.monotonic()
+            first_field_at = None
+            try:
+                if LLM_STREAM:
+                    content, first_field_at = _stream_completion(client, model, messages)
+                else:
+                    completion = client.chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        max_tokens=LLM_MAX_TOKENS,
+                    )
+                    content = completion.choices[0].message.content
+                    first_field_at = time.monotonic()
+                print(f"DEBUG: Raw content from LLM for {word}: {content}")
+
+                # Clean up potential markdown code blocks
+                content = content.replace("```json", "").replace("```", "").strip()
+
+                return json.loads(content)
+            except (StreamAborted, json.JSONDecodeError) as e:
+                # Invalid output is retried; network/API errors are not
+                print(f"Invalid response for {word} (attempt {attempts}): {e}")
+                aborts.append(str(e))
+                if attempts > LLM_STREAM_RETRIES:
+                    raise
     except Exception as e:
         print(f"Error fetching data from {provider}: {e}")
         raise e
+    finally:
+        if metrics is not None:
+            # Filled on failure too, so exhausted retries still report attempts and aborts
+            metrics.update({
+                "streamed": LLM_STREAM,
+                "attempts": attempts,
+                "aborts": aborts,
+                # Measured from the start of the first attempt, so aborted attempts are included
+                "time_to_first_field_s": round(first_field_at - start, 3) if first_field_at else None,
+                "attempt_time_to_first_field_s": round(first_field_at - attempt_start, 3) if first_field_at else None,
+                "total_s": round(time.monotonic() - start, 3),
+            })
+        if not shared_client:
+            client.close()
+
+def _stream_completion(client, model, messages):
+    """Streams a completion through IncrementalJSONValidator.
+
+    Returns the full content and the monotonic time the first top-level
+    field completed; raises StreamAborted as soon as the output can't be valid.
+    """
+    validator = IncrementalJSONValidator()
+    parts = []
+    stream = client.chat.completions.create(
+        model=model,
+        messages=messages,
+        max_tokens=LLM_MAX_TOKENS,
+        stream=True,
+    )
+    try:
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            piece = chunk.choices[0].delta.content
+            if not piece:
+                continue
+            validator.feed(piece)
+            parts.append(piece)
+    finally:
+        # Closing early drops the connection so the provider stops generating
+        stream.close()
+
+    if not validator.done:
+        raise StreamAborted("stream ended before JSON was complete")
+    return "".join(parts), validator.first_field_at
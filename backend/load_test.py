@@ -0,0 +1,485 @@
+"""
+Load-testing harness for the batch and single-word endpoints.
+
+Starts a local fake OpenAI/Ollama-compatible server with configurable latency,
+error rate and 429 rate, launches the backend pointed at it, fires concurrent
+CSV uploads (plus status polls) and optional /generate-word requests, then
+reports completion-time percentiles, status latency, time-to-first-field,
+words/sec and server RSS.
+
+Example:
+    python load_test.py --uploads 20 --words-per-csv 10 --latency-median-ms 800
+"""
+import argparse
+import json
+import math
+import os
+import random
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+GENERATED_DIR = os.path.join(os.path.dirname(BACKEND_DIR), "generated_presentations")
+
+SAMPLE_WORDS = [
+    "Serendipity", "Ephemeral", "Luminous", "Resilient", "Eloquent",
+    "Generator", "Symbol", "Conscientious", "Apple", "Banana",
+]
+
+def canned_word_data(word):
+    """Returns a valid word JSON payload in the shape get_word_data expects."""
+    letters = [c for c in word.lower() if c.isalpha()] or ["a"]
+    phonemes = [f"/{c}/" for c in letters]
+    return {
+        "definition": f"A made-up definition for {word}.",
+        "sentence": f"The class practised spelling {word} today.",
+        "synonyms": "alpha, beta, gamma, delta, epsilon",
+        "morphology": f"{word} comes from a pretend root used for load testing.",
+        "antonyms": "omega, zeta, theta",
+        "ipa": "/" + "".join(letters) + "/",
+        "phonemes": phonemes,
+        "graphemes": letters,
+        "sound_breakdown": [
+            {"phoneme": p, "type": "consonant sound", "example": "cat"} for p in phonemes
+        ],
+        "summary": f"So {word} is:\nSounds: " + " – ".join(phonemes) + "\nSpelling: " + " + ".join(letters),
+    }
+
+class FakeLLMConfig:
+    """Behaviour knobs for the fake LLM server."""
+    def __init__(self, latency_median_ms=500.0, latency_sigma=0.5, error_rate=0.0, rate_limit_rate=0.0,
+                 bad_stream_rate=0.0, stream_chunk_chars=16, seed=None):
+        self.latency_median_ms = latency_median_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.bad_stream_rate = bad_stream_rate
+        self.stream_chunk_chars = stream_chunk_chars
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = {"requests": 0, "ok": 0, "errors": 0, "rate_limited": 0, "bad_streams": 0}
+
+    def sample_latency(self):
+        """Samples a response delay in seconds from a log-normal distribution."""
+        with self.lock:
+            if self.latency_sigma <= 0:
+                return self.latency_median_ms / 1000.0
+            return self.random.lognormvariate(math.log(max(self.latency_median_ms, 1e-3)), self.latency_sigma) / 1000.0
+
+    def pick_outcome(self):
+        """Chooses whether the next request succeeds, errors or is rate limited."""
+        with self.lock:
+            self.counts["requests"] += 1
+            roll = self.random.random()
+            if roll < self.rate_limit_rate:
+                self.counts["rate_limited"] += 1
+                return "rate_limited"
+            if roll < self.rate_limit_rate + self.error_rate:
+                self.counts["errors"] += 1
+                return "error"
+            self.counts["ok"] += 1
+            return "ok"
+
+    def pick_bad_stream(self):
+        """Decides whether a streamed response should start with prose instead of JSON."""
+        with self.lock:
+            if self.random.random() < self.bad_stream_rate:
+                self.counts["bad_streams"] += 1
+                return True
+            return False
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    """Serves the subset of the OpenAI/Ollama API the backend uses."""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, model, content, duration):
+        """Sends content as OpenAI-style server-sent events spread over duration seconds."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        size = self.server.config.stream_chunk_chars
+        pieces = [content[i:i + size] for i in range(0, len(content), size)] or [""]
+        delay = duration / len(pieces)
+        chunk_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+
+        def event(delta, finish_reason=None):
+            return {
+                "id": chunk_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+
+        try:
+            for i, piece in enumerate(pieces):
+                delta = {"content": piece}
+                if i == 0:
+                    delta["role"] = "assistant"
+                self.wfile.write(f"data: {json.dumps(event(delta))}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                time.sleep(delay)
+            self.wfile.write(f"data: {json.dumps(event({}, 'stop'))}\n\ndata: [DONE]\n\n".encode("utf-8"))
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # The client aborted the stream early
+            pass
+
+    def do_GET(self):
+        if self.path.rstrip("/") in ("/api/tags",):
+            self._send_json(200, {"models": [{"name": "fake-model"}]})
+        elif self.path.rstrip("/") in ("/models", "/v1/models"):
+            self._send_json(200, {"data": [{"id": "fake-model", "name": "Fake Model"}]})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": {"message": "invalid JSON"}})
+            return
+
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": "not found"})
+            return
+
+        config = self.server.config
+        latency = config.sample_latency()
+        stream = bool(request.get("stream"))
+        # Streamed responses spend part of the latency before the first chunk, the rest spread across chunks
+        time.sleep(latency * 0.2 if stream else latency)
+        outcome = config.pick_outcome()
+        if outcome == "rate_limited":
+            self._send_json(429, {"error": {"message": "Rate limit exceeded", "type": "rate_limit_error"}}, {"Retry-After": "0"})
+            return
+        if outcome == "error":
+            self._send_json(500, {"error": {"message": "Injected server error", "type": "server_error"}})
+            return
+
+        prompt = " ".join(m.get("content", "") for m in request.get("messages", []))
+        match = re.search(r'for the word "([^"]+)"', prompt)
+        word = match.group(1) if match else "word"
+        content = json.dumps(canned_word_data(word), ensure_ascii=False)
+        if stream:
+            if config.pick_bad_stream():
+                content = "Sure! Here is the information you asked for about " + word + ". " * 50
+            self._send_stream(request.get("model", "fake-model"), content, latency * 0.8)
+            return
+        self._send_json(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "fake-model"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": len(content.split()), "total_tokens": 0},
+        })
+
+def start_fake_llm_server(config, host="127.0.0.1", port=0):
+    """Starts the fake LLM server on a background thread and returns it."""
+    server = ThreadingHTTPServer((host, port), FakeLLMHandler)
+    server.daemon_threads = True
+    server.config = config
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+def find_free_port():
+    """Returns a free TCP port on localhost."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_backend(port, llm_url, workdir, stream=True):
+    """Launches the backend with uvicorn, pointing llm_service at the fake server."""
+    env = os.environ.copy()
+    env["OLLAMA_BASE_URL"] = llm_url
+    env["OPENROUTER_BASE_URL"] = f"{llm_url}/v1"
+    env["OPENROUTER_API_KEY"] = "load-test"
+    env["LLM_STREAM"] = "1" if stream else "0"
+    cmd = [
+        sys.executable, "-m", "uvicorn", "main:app",
+        "--app-dir", BACKEND_DIR,
+        "--host", "127.0.0.1", "--port", str(port),
+        "--log-level", "warning",
+    ]
+    return subprocess.Popen(cmd, cwd=workdir, env=env, stdout=subprocess.DEVNULL)
+
+def wait_for_backend(base_url, process, timeout=30.0):
+    """Blocks until the backend answers on its root endpoint."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Backend exited early with code {process.returncode}")
+        try:
+            if requests.get(f"{base_url}/", timeout=1).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("Backend did not become ready in time")
+
+def read_rss_bytes(pid):
+    """Reads the resident set size of a process from /proc (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+class RSSSampler(threading.Thread):
+    """Samples the backend's RSS periodically while the test runs."""
+    def __init__(self, pid, interval=0.5):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            rss = read_rss_bytes(self.pid)
+            if rss is not None:
+                self.samples.append(rss)
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+def percentile(values, pct):
+    """Nearest-rank percentile; returns None for an empty list."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+def run_batch_job(base_url, index, words_per_csv, provider, model, poll_interval, job_timeout):
+    """Uploads one CSV, polls until the job finishes and returns its timings."""
+    words = [f"{SAMPLE_WORDS[(index + i) % len(SAMPLE_WORDS)]}{index}x{i}" for i in range(words_per_csv)]
+    csv_content = "Word\n" + "\n".join(words) + "\n"
+    result = {"job_id": None, "completion_s": None, "status": "error", "processed": 0, "failed_words": 0,
+              "status_latencies": [], "first_field_times": [], "aborts": 0}
+
+    start = time.monotonic()
+    try:
+        response = requests.post(
+            f"{base_url}/api/batch/upload",
+            files={"file": (f"load_{index}.csv", csv_content.encode("utf-8"), "text/csv")},
+            data={"provider": provider, "model": model},
+            timeout=job_timeout,
+        )
+        response.raise_for_status()
+        job_id = response.json()["job_id"]
+        result["job_id"] = job_id
+
+        while time.monotonic() - start < job_timeout:
+            poll_start = time.monotonic()
+            status_resp = requests.get(f"{base_url}/api/batch/{job_id}/status", timeout=job_timeout)
+            result["status_latencies"].append(time.monotonic() - poll_start)
+            status_resp.raise_for_status()
+            status_data = status_resp.json()
+            if status_data["status"] != "processing":
+                result["completion_s"] = time.monotonic() - start
+                result["status"] = status_data["status"]
+                result["processed"] = status_data.get("processed_items", 0)
+                result["failed_words"] = sum(1 for f in status_data.get("files", []) if f.get("status") == "error")
+                for file_info in status_data.get("files", []):
+                    metrics = file_info.get("metrics") or {}
+                    if metrics.get("time_to_first_field_s") is not None:
+                        result["first_field_times"].append(metrics["time_to_first_field_s"])
+                    result["aborts"] += len(metrics.get("aborts", []))
+                return result
+            time.sleep(poll_interval)
+        result["status"] = "timeout"
+    except Exception as e:
+        print(f"Upload {index} failed: {e}")
+    return result
+
+def run_single_word(base_url, index, provider, model, timeout):
+    """Calls /generate-word once and returns (latency_s, ok)."""
+    word = f"{SAMPLE_WORDS[index % len(SAMPLE_WORDS)]}{index}"
+    start = time.monotonic()
+    try:
+        response = requests.post(
+            f"{base_url}/generate-word",
+            json={"word": word, "provider": provider, "model": model},
+            timeout=timeout,
+        )
+        return time.monotonic() - start, response.status_code == 200
+    except requests.RequestException as e:
+        print(f"Single-word request {index} failed: {e}")
+        return time.monotonic() - start, False
+
+def format_seconds(value):
+    return "n/a" if value is None else f"{value * 1000:.0f} ms"
+
+def format_bytes(value):
+    return "n/a" if value is None else f"{value / (1024 * 1024):.1f} MiB"
+
+def report(args, batch_results, single_results, elapsed, rss_samples, llm_counts):
+    """Prints a summary of the run."""
+    completions = [r["completion_s"] for r in batch_results if r["completion_s"] is not None]
+    status_latencies = [lat for r in batch_results for lat in r["status_latencies"]]
+    words_done = sum(r["processed"] for r in batch_results)
+    words_failed = sum(r["failed_words"] for r in batch_results)
+    # processed_items also counts failed words, so throughput only uses successes
+    words_ok = words_done - words_failed
+    jobs_ok = sum(1 for r in batch_results if r["status"] == "completed")
+
+    print("\n=== Load test results ===")
+    print(f"Uploads: {len(batch_results)} x {args.words_per_csv} words, concurrency {args.concurrency}")
+    print(f"Jobs completed: {jobs_ok}/{len(batch_results)}")
+    print(f"Words processed: {words_done} ({words_failed} failed)")
+    print(f"Wall time: {elapsed:.2f} s")
+    print(f"Throughput: {words_ok / elapsed if elapsed else 0:.2f} successful words/sec")
+    print("Job completion time: p50 {}  p95 {}  p99 {}".format(
+        *(format_seconds(percentile(completions, p)) for p in (50, 95, 99))))
+    print("Status endpoint latency: p50 {}  p95 {}  p99 {}  ({} polls)".format(
+        *(format_seconds(percentile(status_latencies, p)) for p in (50, 95, 99)), len(status_latencies)))
+    first_field_times = [t for r in batch_results for t in r["first_field_times"]]
+    print("Time to first valid field: p50 {}  p95 {}  p99 {}  ({} stream aborts)".format(
+        *(format_seconds(percentile(first_field_times, p)) for p in (50, 95, 99)), sum(r["aborts"] for r in batch_results)))
+
+    if single_results:
+        latencies = [lat for lat, _ in single_results]
+        ok = sum(1 for _, success in single_results if success)
+        print(f"/generate-word: {ok}/{len(single_results)} ok")
+        print("/generate-word latency: p50 {}  p95 {}  p99 {}".format(
+            *(format_seconds(percentile(latencies, p)) for p in (50, 95, 99))))
+
+    if rss_samples:
+        print(f"Server RSS: start {format_bytes(rss_samples[0])}  peak {format_bytes(max(rss_samples))}  end {format_bytes(rss_samples[-1])}")
+    else:
+        print("Server RSS: n/a (requires /proc)")
+
+    print("Fake LLM: {requests} requests, {ok} ok, {errors} errors, {rate_limited} rate limited, {bad_streams} bad streams".format(**llm_counts))
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the Spelling PowerPoint backend against a fake LLM server.")
+    parser.add_argument("--uploads", type=int, default=10, help="Number of CSV uploads (N).")
+    parser.add_argument("--words-per-csv", type=int, default=5, help="Words per uploaded CSV (M).")
+    parser.add_argument("--concurrency", type=int, default=None, help="Concurrent clients (defaults to --uploads).")
+    parser.add_argument("--single-words", type=int, default=0, help="Additional concurrent /generate-word requests.")
+    parser.add_argument("--provider", choices=["ollama", "openrouter"], default="ollama")
+    parser.add_argument("--model", default="fake-model")
+    parser.add_argument("--latency-median-ms", type=float, default=500.0, help="Median fake LLM latency.")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Log-normal sigma of the latency (0 = fixed).")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of LLM calls that return 500.")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of LLM calls that return 429.")
+    parser.add_argument("--bad-stream-rate", type=float, default=0.0, help="Fraction of streamed responses that start with prose.")
+    parser.add_argument("--no-stream", action="store_true", help="Run the backend with LLM_STREAM=0 for comparison.")
+    parser.add_argument("--poll-interval", type=float, default=0.5, help="Seconds between status polls.")
+    parser.add_argument("--job-timeout", type=float, default=600.0, help="Per-job timeout in seconds.")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--backend-url", default=None,
+                        help="Use an already-running backend instead of launching one (it must already point at a fake server; RSS is not reported).")
+    parser.add_argument("--llm-port", type=int, default=0, help="Port for the fake LLM server (0 = random).")
+    parser.add_argument("--keep-output", action="store_true", help="Keep generated PPTX files.")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    config = FakeLLMConfig(
+        latency_median_ms=args.latency_median_ms,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        bad_stream_rate=args.bad_stream_rate,
+        seed=args.seed,
+    )
+    llm_server = start_fake_llm_server(config, port=args.llm_port)
+    llm_url = f"http://127.0.0.1:{llm_server.server_address[1]}"
+    print(f"Fake LLM server listening on {llm_url}")
+
+    workdir = tempfile.mkdtemp(prefix="load_test_")
+    backend = None
+    sampler = None
+    batch_results = []
+    single_results = []
+    try:
+        if args.backend_url:
+            base_url = args.backend_url.rstrip("/")
+        else:
+            port = find_free_port()
+            base_url = f"http://127.0.0.1:{port}"
+            backend = start_backend(port, llm_url, workdir, stream=not args.no_stream)
+            wait_for_backend(base_url, backend)
+            sampler = RSSSampler(backend.pid)
+            sampler.start()
+        print(f"Backend ready at {base_url}")
+
+        concurrency = args.concurrency or max(args.uploads + args.single_words, 1)
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            batch_futures = [
+                pool.submit(run_batch_job, base_url, i, args.words_per_csv, args.provider, args.model,
+                            args.poll_interval, args.job_timeout)
+                for i in range(args.uploads)
+            ]
+            single_futures = [
+                pool.submit(run_single_word, base_url, i, args.provider, args.model, args.job_timeout)
+                for i in range(args.single_words)
+            ]
+            batch_results = [f.result() for f in batch_futures]
+            single_results = [f.result() for f in single_futures]
+        elapsed = time.monotonic() - start
+
+        args.concurrency = concurrency
+        report(args, batch_results, single_results, elapsed, sampler.samples if sampler else [], config.counts)
+    finally:
+        if sampler:
+            sampler.stop()
+        if backend:
+            backend.terminate()
+            try:
+                backend.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                backend.kill()
+        llm_server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+        if not args.keep_output:
+            for r in batch_results:
+                if r["job_id"]:
+                    shutil.rmtree(os.path.join(GENERATED_DIR, r["job_id"]), ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -3,12 +3,14 @@ from fastapi.responses import FileResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Optional, List
+from contextlib import asynccontextmanager
 import shutil
 import os
 import sys
 import csv
 from datetime import datetime
 import tempfile
+import threading
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -16,11 +18,29 @@ load_dotenv(os.path.join(os.path.dirname(__file__), '.env'))
 
 # Add parent directory to path to import create_presentation
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from create_presentation import create_presentation, create_presentation_from_data
+# create_presentation (python-pptx/lxml) is imported on first use to keep startup fast
 from backend.llm_service import get_word_data, get_ollama_models, get_openrouter_models
+import backend.llm_service as llm_service
 import backend.job_manager as job_manager
 
-app = FastAPI()
+def warm_up():
+    """Pre-loads the PPTX template and LLM clients so the first request doesn't pay for them."""
+    try:
+        import create_presentation
+        create_presentation.warm_up()
+        llm_service.warm_up()
+        print("Warm-up complete")
+    except Exception as e:
+        print(f"Warm-up failed: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Opt-in via WARMUP_ON_STARTUP=1; runs in a background thread so startup isn't delayed
+    if os.getenv("WARMUP_ON_STARTUP", "").lower() in ("1", "true", "yes"):
+        threading.Thread(target=warm_up, daemon=True).start()
+    yield
+
+app = FastAPI(lifespan=lifespan)
 
 # Allow CORS for frontend
 app.add_middleware(
@@ -63,6 +83,8 @@ async def get_openrouter_models_endpoint():
 def process_batch_job(job_id: str, temp_csv_path: str, provider: str, api_key: str, model: str):
     """Background task to process the CSV and generate files."""
     try:
+        from create_presentation import create_presentation_from_data
+
         # Create a job-specific directory
         job_dir = os.path.join(GENERATED_DIR, job_id)
         os.makedirs(job_dir, exist_ok=True)
@@ -86,13 +108,16 @@ def process_batch_job(job_id: str, temp_csv_path: str, provider: str, api_key: s
         
         for word in words:
             print(f"Job {job_id}: Processing {word}...")
+            # Filled by get_word_data even when it fails, so errors keep their attempts/aborts
+            metrics = {}
             try:
                 # 1. Get AI Data
                 ai_data = get_word_data(
                     word=word, 
                     api_key=api_key, 
                     provider=provider, 
-                    model=model
+                    model=model,
+                    metrics=metrics
                 )
                 word_info = {"word": word}
                 word_info.update(ai_data)
@@ -105,11 +130,11 @@ def process_batch_job(job_id: str, temp_csv_path: str, provider: str, api_key: s
                 create_presentation_from_data(word_info, output_path)
                 
                 # 3. Update Job Status
-                job_manager.update_job_progress(job_id, word, filename)
+                job_manager.update_job_progress(job_id, word, filename, metrics=metrics)
                 
             except Exception as e:
                 print(f"Job {job_id}: Failed for {word}: {e}")
-                job_manager.update_job_progress(job_id, word, error=str(e))
+                job_manager.update_job_progress(job_id, word, error=str(e), metrics=metrics)
                 
     except Exception as e:
         print(f"Job {job_id} failed completely: {e}")
@@ -171,6 +196,8 @@ async def generate_word(request: WordRequest):
     output_pptx = f"Generated_{request.word}.pptx"
     
     try:
+        from create_presentation import create_presentation_from_data
+
         word_data = request.dict()
         
         use_ai = False
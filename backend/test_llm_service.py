@@ -0,0 +1,151 @@
+"""
+Tests for the streaming JSON validator and retry path in llm_service.
+
+These need no network or LLM: the retry tests use a stub client.
+
+Run with: pytest test_llm_service.py
+"""
+from types import SimpleNamespace
+
+import pytest
+
+import llm_service
+from llm_service import IncrementalJSONValidator, StreamAborted
+
+def feed_all(text, chunk_size=1, **budgets):
+    """Feeds text to a fresh validator in small chunks and returns it."""
+    validator = IncrementalJSONValidator(**budgets)
+    for i in range(0, len(text), chunk_size):
+        validator.feed(text[i:i + chunk_size])
+    return validator
+
+def test_accepts_markdown_fence():
+    validator = feed_all('```json\n{"definition": "A word.", "phonemes": ["a", "b"]}\n```')
+    assert validator.done
+    assert validator.fields_completed == 2
+
+def test_rejects_prose_before_json():
+    with pytest.raises(StreamAborted, match="before JSON"):
+        feed_all('Sure! Here is the JSON: {"a": 1}')
+
+def test_rejects_trailing_text():
+    with pytest.raises(StreamAborted, match="after JSON"):
+        feed_all('{"a": 1} I hope this helps!')
+
+def test_rejects_mismatched_brackets():
+    with pytest.raises(StreamAborted):
+        feed_all('{"a": [1, 2}')
+
+@pytest.mark.parametrize("text", [
+    '{"a": "x" "b": 1}',
+    '{"a": 1.2.3}',
+    '{"a": tru}',
+    '{1: 2}',
+    '{"a":,}',
+    '{"a": [1, 2,]}',
+    '{"a": 01}',
+    '{"a": 1,}',
+])
+def test_rejects_invalid_grammar_mid_stream(text):
+    with pytest.raises(StreamAborted):
+        feed_all(text)
+
+def test_list_item_budget():
+    at_limit = '{"a": [' + ", ".join(["1"] * 3) + "]}"
+    assert feed_all(at_limit, max_list_items=3).done
+    over_limit = '{"a": [' + ", ".join(["1"] * 4) + "]}"
+    with pytest.raises(StreamAborted, match="list exceeded 3 items"):
+        feed_all(over_limit, max_list_items=3)
+
+def test_string_length_budget():
+    assert feed_all('{"a": "' + "x" * 10 + '"}', max_field_chars=10).done
+    with pytest.raises(StreamAborted, match="string value exceeded 10"):
+        feed_all('{"a": "' + "x" * 11 + '"}', max_field_chars=10)
+
+def test_response_length_budget():
+    with pytest.raises(StreamAborted, match="response exceeded"):
+        feed_all('{"a": "' + "x" * 50 + '"}', chunk_size=8, max_chars=20)
+
+def test_escaped_quotes_stay_inside_string():
+    validator = feed_all('{"a": "say \\"hi\\" {[", "b": "\\u00e9"}')
+    assert validator.done
+    assert validator.fields_completed == 2
+
+def test_first_field_recorded_when_first_value_completes():
+    validator = IncrementalJSONValidator()
+    validator.feed('{"definition": "A wo')
+    assert validator.first_field_at is None
+    assert validator.fields_completed == 0
+    validator.feed('rd.", "sound_breakdown": [{"phoneme": "a"}')
+    assert validator.first_field_at is not None
+    assert validator.fields_completed == 1
+    validator.feed("]}")
+    assert validator.done
+    assert validator.fields_completed == 2
+
+class StubStream:
+    """Iterable of OpenAI-style stream chunks."""
+    def __init__(self, pieces):
+        self.pieces = pieces
+        self.closed = False
+
+    def __iter__(self):
+        for piece in self.pieces:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+
+    def close(self):
+        self.closed = True
+
+class StubClient:
+    """Returns the given streams (or plain completion strings) in order from chat.completions.create."""
+    def __init__(self, streams):
+        self.streams = list(streams)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        response = self.streams.pop(0)
+        if isinstance(response, str):
+            # Non-streamed completion
+            assert not kwargs.get("stream")
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=response))])
+        assert kwargs.get("stream") is True
+        return response
+
+def test_retries_bad_stream_then_succeeds(monkeypatch):
+    bad = StubStream(["Sure! ", "Here you go: ", '{"a": 1}'])
+    good = StubStream(['```json\n{"definition": ', '"A word.", "synonyms": "x, y"}', "\n```"])
+    monkeypatch.setattr(llm_service, "LLM_STREAM", True)
+    monkeypatch.setattr(llm_service, "get_client", lambda base_url, api_key: StubClient([bad, good]))
+
+    metrics = {}
+    data = llm_service.get_word_data("word", provider="ollama", metrics=metrics)
+
+    assert data == {"definition": "A word.", "synonyms": "x, y"}
+    assert bad.closed and good.closed
+    assert metrics["attempts"] == 2
+    assert len(metrics["aborts"]) == 1
+    assert "before JSON" in metrics["aborts"][0]
+    assert metrics["time_to_first_field_s"] is not None
+
+def test_metrics_filled_when_retries_exhausted(monkeypatch):
+    streams = [StubStream(["Nope"]) for _ in range(3)]
+    monkeypatch.setattr(llm_service, "LLM_STREAM", True)
+    monkeypatch.setattr(llm_service, "LLM_STREAM_RETRIES", 2)
+    monkeypatch.setattr(llm_service, "get_client", lambda base_url, api_key: StubClient(streams))
+
+    metrics = {}
+    with pytest.raises(StreamAborted):
+        llm_service.get_word_data("word", provider="ollama", metrics=metrics)
+
+    assert metrics["attempts"] == 3
+    assert len(metrics["aborts"]) == 3
+    assert metrics["time_to_first_field_s"] is None
+
+def test_unparseable_completion_is_retried(monkeypatch):
+    monkeypatch.setattr(llm_service, "LLM_STREAM", False)
+    monkeypatch.setattr(llm_service, "get_client", lambda base_url, api_key: StubClient(['{"a": 1,}', '{"a": 1}']))
+
+    metrics = {}
+    assert llm_service.get_word_data("word", provider="ollama", metrics=metrics) == {"a": 1}
+    assert metrics["attempts"] == 2
+    assert metrics["streamed"] is False
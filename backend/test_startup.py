@@ -0,0 +1,86 @@
+"""
+Startup budget check for the backend.
+
+Measures (in fresh interpreters) how long `import main` takes, confirms that
+python-pptx/openai/requests are not loaded at import time, and times the first
+PPTX render with and without warm-up. Budgets can be overridden with the
+IMPORT_BUDGET_S, FIRST_RENDER_BUDGET_S and WARM_RENDER_MAX_RATIO environment
+variables.
+
+Run with: python test_startup.py   (or pytest test_startup.py)
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+IMPORT_BUDGET_S = float(os.getenv("IMPORT_BUDGET_S", "2.0"))
+FIRST_RENDER_BUDGET_S = float(os.getenv("FIRST_RENDER_BUDGET_S", "0.5"))
+# The first render after warm-up must take at most this fraction of a cold first render
+WARM_RENDER_MAX_RATIO = float(os.getenv("WARM_RENDER_MAX_RATIO", "0.5"))
+HEAVY_MODULES = ["pptx", "lxml", "openai", "requests"]
+RUNS = 3
+
+IMPORT_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+print(json.dumps({"import_s": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+RENDER_SNIPPET = """
+import io, json, time
+import main
+warm = %r
+if warm:
+    main.warm_up()
+word = {"word": "Test", "definition": "A trial.", "sentence": "We sat the test.", "synonyms": "exam, quiz"}
+start = time.perf_counter()
+from create_presentation import create_presentation_from_data
+create_presentation_from_data(word, io.BytesIO())
+print(json.dumps({"render_s": time.perf_counter() - start}))
+"""
+
+def run_snippet(code):
+    """Runs a snippet in a fresh interpreter from the backend directory and returns its JSON output."""
+    env = os.environ.copy()
+    env.pop("WARMUP_ON_STARTUP", None)
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    # The last line is our JSON; earlier lines are prints from the app
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def test_import_time_budget():
+    results = [run_snippet(IMPORT_SNIPPET) for _ in range(RUNS)]
+    import_s = statistics.median(r["import_s"] for r in results)
+    print(f"import main: {import_s * 1000:.0f} ms (budget {IMPORT_BUDGET_S * 1000:.0f} ms)")
+    assert import_s < IMPORT_BUDGET_S, f"import main took {import_s:.2f}s, budget is {IMPORT_BUDGET_S:.2f}s"
+
+def test_heavy_modules_not_imported():
+    loaded = run_snippet(IMPORT_SNIPPET)["loaded"]
+    assert not loaded, f"Heavy modules loaded at import time: {', '.join(loaded)}"
+
+def test_first_render_budget():
+    cold_s = statistics.median(run_snippet(RENDER_SNIPPET % (False,))["render_s"] for _ in range(RUNS))
+    warm_s = statistics.median(run_snippet(RENDER_SNIPPET % (True,))["render_s"] for _ in range(RUNS))
+    print(f"first render: cold {cold_s * 1000:.0f} ms, after warm-up {warm_s * 1000:.0f} ms (budget {FIRST_RENDER_BUDGET_S * 1000:.0f} ms)")
+    assert warm_s < FIRST_RENDER_BUDGET_S, f"First render after warm-up took {warm_s:.2f}s, budget is {FIRST_RENDER_BUDGET_S:.2f}s"
+    assert warm_s <= cold_s * WARM_RENDER_MAX_RATIO, (
+        f"Warm-up saved too little: warm {warm_s:.3f}s vs cold {cold_s:.3f}s (max ratio {WARM_RENDER_MAX_RATIO})"
+    )
+
+if __name__ == "__main__":
+    failures = 0
+    for check in (test_import_time_budget, test_heavy_modules_not_imported, test_first_render_budget):
+        try:
+            check()
+            print(f"PASS {check.__name__}")
+        except AssertionError as e:
+            failures += 1
+            print(f"FAIL {check.__name__}: {e}")
+    sys.exit(1 if failures else 0)
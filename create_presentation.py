@@ -1,4 +1,5 @@
 import csv
+import io
 from pptx import Presentation
 from pptx.util import Inches, Pt
 from pptx.dml.color import RGBColor
@@ -290,5 +291,24 @@ def create_batch_presentation(list_of_word_data, output_file):
     prs.save(output_file)
     print(f"Successfully created batch presentation {output_file}")
 
+def warm_up():
+    """Renders a throwaway presentation in memory so template parsing and lxml setup happen before the first request."""
+    sample = {
+        "word": "warm",
+        "definition": "Slightly hot.",
+        "sentence": "The soup is warm.",
+        "morphology": "Old English.",
+        "synonyms": "mild, tepid",
+        "antonyms": "cold",
+        "ipa": "/wɔːm/",
+        "phonemes": ["w", "ɔː", "m"],
+        "graphemes": ["w", "ar", "m"],
+        "sound_breakdown": [{"phoneme": "w", "type": "consonant sound", "example": "wet"}],
+        "summary": "So warm is: w + ar + m",
+    }
+    prs = Presentation()
+    add_word_slides(prs, sample)
+    prs.save(io.BytesIO())
+
 if __name__ == "__main__":
     create_presentation("Week-7-Spelling-Update-Guide.csv", "Spelling_Presentation.pptx")